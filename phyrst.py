@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from enum import Enum
 from functools import reduce
+from itertools import product
 from typing import (
     Any,
     Callable,
@@ -325,3 +326,178 @@ class Model:
         assignment = assignment or {}
         sems = self.universe, self.interpretation, assignment
         return expr(*sems)
+
+
+class ModelStack:
+    """A stack of models of the same type that share the universe range(size).
+    Interpretations are tabulated once and each model is a bit of a python
+    int, so an expression is evaluated for all of them in a single pass
+    using bitwise operations instead of once per model."""
+
+    ttype: Type
+    size: int
+    interpretations: Sequence[Interpretation]
+    everymodel: int  # Bitmask with one bit set per model
+    # CONST: per element, mask of models where the const is that element
+    # FUNC: per arguments tuple, per result element, mask of models
+    # REL: per arguments tuple, mask of models where the relation holds
+    tables: Dict[str, Any]
+
+    def __init__(
+        self, ttype: Type, size: int, interpretations: Sequence[Interpretation]
+    ) -> None:
+        self.ttype = ttype
+        self.size = size
+        self.interpretations = interpretations
+        self.everymodel = (1 << len(interpretations)) - 1
+        self.tables = {}
+
+        self._tabulate()
+
+    def _tabulate(self) -> None:
+        "Precompute the interpretation of every type name for every model"
+        size = self.size
+
+        def elementmasks(elements: List[int], what: str) -> List[int]:
+            "Per element, mask of the models whose value is that element"
+            assert all(e in range(size) for e in elements), f"{what} not in universe"
+            return [self._mask(value == e for value in elements) for e in range(size)]
+
+        for name, ntype in self.ttype.name_types:
+            if ntype is ExprType.CONST:
+                elements = [i[name] for i in self.interpretations]
+                self.tables[name] = elementmasks(elements, name)
+            elif ntype is ExprType.FUNC:
+                ftable: Dict[Tuple[int, ...], List[int]] = {}
+                for args in product(range(size), repeat=self.ttype.arities[name]):
+                    elements = [i[name](*args) for i in self.interpretations]
+                    ftable[args] = elementmasks(elements, f"{name}{args}")
+                self.tables[name] = ftable
+            elif ntype is ExprType.REL:
+                rtable: Dict[Tuple[int, ...], int] = {}
+                for args in product(range(size), repeat=self.ttype.arities[name]):
+                    holds = (i[name](*args) for i in self.interpretations)
+                    rtable[args] = self._mask(holds)
+                self.tables[name] = rtable
+
+    def __len__(self) -> int:
+        return len(self.interpretations)
+
+    @staticmethod
+    def _mask(bools: Iterable[bool]) -> int:
+        """Packs a bool per model into a mask in linear time, setting bits one
+        by one with |= would copy the whole int for each model"""
+        return int("".join("1" if b else "0" for b in bools)[::-1] or "0", 2)
+
+    def _bools(self, mask: int) -> List[bool]:
+        "Unpacks a mask of models into a list with a bool per model in linear time"
+        n = len(self)
+        return [bit == "1" for bit in bin(mask)[:1:-1].ljust(n, "0")[:n]]
+
+    def _eval(
+        self, expr: Expression, assignment: Dict[str, int]
+    ) -> Union[int, List[int]]:
+        """Evaluates expr in all models at once. Formulas return a mask of the
+        models that satisfy them, terms return per element the mask of models
+        in which the term evaluates to that element"""
+        name = cast(str, expr.name)
+        exprtype = expr.exprtype
+        everymodel = self.everymodel
+        size = self.size
+        subexprs = expr.subexpressions
+
+        def term(t: Expression) -> List[int]:
+            return cast(List[int], self._eval(t, assignment))
+
+        def formula(f: Expression, a: Dict[str, int] = assignment) -> int:
+            return cast(int, self._eval(f, a))
+
+        def selected(args: Tuple[int, ...], terms: List[List[int]]) -> int:
+            "Mask of models in which each term evaluates to its element in args"
+            return reduce(
+                lambda sel, ta: sel & ta[0][ta[1]], zip(terms, args), everymodel
+            )
+
+        # -> List[int]
+        if exprtype is ExprType.CONST:
+            return self.tables[name]
+        if exprtype is ExprType.VAR:
+            return [everymodel if e == assignment[name] else 0 for e in range(size)]
+        if exprtype is ExprType.FUNC:
+            terms = [term(t) for t in subexprs]
+            result = [0] * size
+            for args, masks in self.tables[name].items():
+                sel = selected(args, terms)
+                if sel:
+                    for e in range(size):
+                        result[e] |= sel & masks[e]
+            return result
+        # -> int
+        if exprtype is ExprType.REL:
+            terms = [term(t) for t in subexprs]
+            return reduce(
+                lambda acc, item: acc | (selected(item[0], terms) & item[1]),
+                self.tables[name].items(),
+                0,
+            )
+        if exprtype is ExprType.EQ:
+            left, right = term(subexprs[0]), term(subexprs[1])
+            return reduce(lambda acc, lr: acc | (lr[0] & lr[1]), zip(left, right), 0)
+        if exprtype is ExprType.AND:
+            left = formula(subexprs[0])
+            return left & formula(subexprs[1]) if left else 0
+        if exprtype is ExprType.OR:
+            left = formula(subexprs[0])
+            return left | formula(subexprs[1]) if left != everymodel else left
+        if exprtype is ExprType.IMPLIES:
+            left = formula(subexprs[0])
+            return (~left & everymodel) | formula(subexprs[1]) if left else everymodel
+        if exprtype is ExprType.IFF:
+            left, right = formula(subexprs[0]), formula(subexprs[1])
+            return ~(left ^ right) & everymodel
+        if exprtype is ExprType.NOT:
+            return ~formula(subexprs[0]) & everymodel
+        if exprtype in (ExprType.EXISTS, ExprType.FORALL):
+            isexists = exprtype is ExprType.EXISTS
+            done = everymodel if isexists else 0  # Value that can't change anymore
+            result = 0 if isexists else everymodel
+            for element in range(size):
+                a = dict(**assignment)
+                a[name] = element
+                value = formula(subexprs[0], a)
+                result = result | value if isexists else result & value
+                if result == done:
+                    break
+            return result
+
+        if exprtype is ExprType.EMPTY:
+            raise Exception("Trying to evaluate an empty expression")
+
+        raise Exception("Invalid semantics reached")
+
+    def eval(
+        self, expr: Expression, assignment: Optional[Dict[str, int]] = None
+    ) -> Union[List[bool], List[int]]:
+        """Evaluates an expression in every model given an assignment of variables.
+        Returns for each model whether it satisfies the formula, or the
+        element the term evaluates to"""
+        assignment = assignment or {}
+        value = self._eval(expr, assignment)
+        if isinstance(value, int):
+            return self._bools(value)
+        elements = [0] * len(self)
+        for e, mask in enumerate(value):
+            for m, isset in enumerate(self._bools(mask)):
+                if isset:
+                    elements[m] = e
+        return elements
+
+    def satisfy(self, theory: Theory) -> List[bool]:
+        "Returns for each model whether it satisfies all the theory axioms"
+        assert theory.ttype is self.ttype
+        mask = reduce(
+            lambda acc, axiom: acc and acc & cast(int, self._eval(axiom, {})),
+            theory.axioms,
+            self.everymodel,
+        )
+        return self._bools(mask)
@@ -10,6 +10,7 @@ from phyrst import (
     ExprType,
     Interpretation,
     Model,
+    ModelStack,
     Theory,
     Type,
     Universe,
@@ -305,3 +306,72 @@ def test_model_exploration():
                     pass  # Example found. Do something like print its r relationship
                 assert not satisfies_phi or satisfies_psi  # phi => psi
     return True
+
+
+def test_model_stack_exploration():
+    "Same exploration as test_model_exploration but evaluating all models at once"
+    ttype = Type(["0"], ["f", "g"], ["r"], {"f": 1, "g": 2, "r": 2})
+    zero, f, g, r = Expression.expr_mappings(ttype)
+    x, y = var("x"), var("y")
+    phi = exists(x, forall(y, r(x, y)))
+    psi = forall(y, exists(x, r(x, y)))
+    reflexivity = forall(x, r(x, x))
+    fixedzero = (f(zero) == zero) & forall(x, r(zero, f(x)) >> ~(x == zero))
+    gjoins = forall(x, exists(y, (r(x, y) | (g(x, y) == x)) ** r(g(y, x), x)))
+    theory = Theory([reflexivity], ttype)
+
+    for l in [1, 2, 3]:  # universe sizes
+        relpairs = tuple(it.product(range(l), range(l)))  # possible 2-element relations
+        rels = [
+            rel
+            for k in range(len(relpairs) + 1)
+            for rel in it.combinations(relpairs, k)
+        ]
+        interpretations = [
+            {
+                "0": l - 1,
+                "f": lambda x, l=l: (x + 1) % l,
+                "g": lambda x, y, l=l, rel=rel: (x + y) % l if (x, y) in rel else x,
+                "r": lambda x, y, rel=rel: (x, y) in rel,
+            }
+            for rel in rels
+        ]
+        stack = ModelStack(ttype, l, interpretations)
+        satisfies_phi = stack.eval(phi)
+        satisfies_psi = stack.eval(psi)
+        assert all(not sphi or spsi for sphi, spsi in zip(satisfies_phi, satisfies_psi))
+        for formula in [phi, psi, fixedzero, gjoins, reflexivity]:
+            assert stack.eval(formula) == [
+                formula(range(l), interpretation, {})
+                for interpretation in interpretations
+            ]
+        assert stack.eval(f(x), {"x": 0}) == [1 % l] * len(interpretations)
+        assert stack.eval(g(x, y), {"x": 0, "y": l - 1}) == [
+            interpretation["g"](0, l - 1) for interpretation in interpretations
+        ]
+        assert ModelStack(ttype, l, []).eval(gjoins) == []
+
+        # Filter candidates by theory and build proper models from them
+        reflexive = stack.satisfy(theory)
+        assert sum(reflexive) == 2 ** (l * l - l)
+        for interpretation in it.compress(interpretations, reflexive):
+            Model(theory, range(l), interpretation)
+
+    # Every relation over four elements, a large enough stack to notice scaling
+    rtype = Type([], [], ["r"], {"r": 2})
+    r = Expression.expr_mappings(rtype)[0]
+    phi = exists(x, forall(y, r(x, y)))
+    psi = forall(y, exists(x, r(x, y) | (x == y)))
+    relpairs = tuple(it.product(range(4), range(4)))
+    interpretations = [
+        {"r": lambda x, y, rel=frozenset(rel): (x, y) in rel}
+        for k in range(len(relpairs) + 1)
+        for rel in it.combinations(relpairs, k)
+    ]
+    stack = ModelStack(rtype, 4, interpretations)
+    assert len(stack) == 2**16
+    for formula in [phi, psi]:
+        assert stack.eval(formula) == [
+            formula(range(4), interpretation, {}) for interpretation in interpretations
+        ]
+    return True